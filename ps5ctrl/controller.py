@@ -2,12 +2,69 @@
 
 
 from __future__ import annotations
-import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+import itertools
+import operator
+import queue
+import sys
+import threading
+import weakref
 try:
     from pydualsense.enums import TriggerModes
     from pydualsense import pydualsense
-except ImportError as e:  # pragma: no cover - optional dependency
+except ImportError:  # pragma: no cover - optional dependency
     pydualsense = None
+    TriggerModes = None
+
+# Raised on instantiation when the optional dependency is missing; the check
+# stays out of import time so the module can be imported (and documented)
+# without pydualsense installed
+_MISSING_PYDUALSENSE = "pydualsense is required. Install via 'pip install pydualsense'."
+
+# Trigger force slots are reset in place from this constant; pydualsense
+# mutates ``forces`` through ``setForce`` so it must stay a list
+_ZERO_FORCES: tuple[int, ...] = (0,) * 7
+
+
+def _cycle_after_first(values: Any) -> Iterator[Any]:
+    """Endlessly cycle ``values``, starting from the second item."""
+    return itertools.islice(itertools.cycle(values), 1, None)
+
+
+def _weak_press_callback(handler: Callable[[bool], Any]) -> Callable[[bool], None]:
+    """Build a button callback that forwards presses only to ``handler``.
+
+    Button events fire on both press and release; releases return straight
+    away without resolving or calling ``handler``. The handler is held
+    through a :class:`weakref.WeakMethod` because the controller owns
+    ``ds`` and ``ds`` owns its event subscribers, so a plain bound method
+    would form a reference cycle only the cyclic GC can break.
+    """
+    ref = weakref.WeakMethod(handler)
+
+    def callback(val: bool) -> None:
+        if val:
+            target = ref()
+            if target is not None:
+                target(val)
+
+    return callback
+
+
+@dataclass(slots=True)
+class TriggerState:
+    """Cycling state for one adaptive trigger (L2 or R2)."""
+
+    mode_iter: Iterator[Any]
+    force_level: int = 0
+    force_iter: Iterator[int] = field(
+        default_factory=lambda: _cycle_after_first(range(7))
+    )
+    # Reentrancy guards; locks rather than flags because callbacks and
+    # callers may be on different threads
+    force_lock: threading.Lock = field(default_factory=threading.Lock)
+    mode_lock: threading.Lock = field(default_factory=threading.Lock)
 
 
 class DualSenseController:
@@ -19,105 +76,208 @@ class DualSenseController:
     so that projects can easily build additional functionality on top.
     """
 
-    def __init__(self) -> None:
-        """Create a new :class:`DualSenseController` instance."""
+    __slots__ = (
+        "ds",
+        "_trigger_modes",
+        "_r2",
+        "_l2",
+        "_stop",
+        "_poll_interval",
+        "_log_q",
+        "_log_thread",
+        "_subscriptions",
+        "_attr_cache",
+        "_lstick",
+        "_rstick",
+        "_trigger_getters",
+        "__weakref__",
+    )
+
+    # Log templates for the input callbacks; ``%`` formatting a cached
+    # template is cheaper per event than building an f-string
+    _FMT_L1 = "L1: %s"
+    _FMT_R1 = "R1: %s"
+    _FMT_L2 = "L2 value: %d"
+    _FMT_R2 = "R2 value: %d"
+    _FMT_L3 = "L3: %s"
+    _FMT_R3 = "R3: %s"
+    _FMT_LS = "Left Stick: x=%d, y=%d"
+    _FMT_RS = "Right Stick: x=%d, y=%d"
+
+    def __init__(self, poll_interval: float | None = None) -> None:
+        """Create a new :class:`DualSenseController` instance.
+
+        ``poll_interval`` is how often, in seconds, :meth:`read_loop` wakes
+        up to check whether it should stop. Smaller values react faster to
+        :meth:`stop` and CTRL+C on platforms where a blocking wait cannot be
+        interrupted (e.g. Windows) at the cost of more CPU wakeups. ``None``
+        blocks without waking up at all.
+        """
 
         if pydualsense is None:
-            raise ImportError(
-                "pydualsense is required. Install via 'pip install pydualsense'."
-            )
+            raise ImportError(_MISSING_PYDUALSENSE)
         self.ds = pydualsense()
-        self._r2_force_level = 0
-        self._r2_mode_index = 0
-        self._l2_force_level = 0
-        self._l2_mode_index = 0
         self._trigger_modes = list(TriggerModes)
-        # Reentrancy guards for trigger force cycling
-        self._handling_r2_force = False
-        self._handling_l2_force = False
+        # Force level and mode start at 0 / the first mode, so cycling
+        # begins one step past them
+        self._r2 = TriggerState(_cycle_after_first(self._trigger_modes))
+        self._l2 = TriggerState(_cycle_after_first(self._trigger_modes))
+        # Set to end :meth:`read_loop`
+        self._stop = threading.Event()
+        self._poll_interval = poll_interval
+        # Log lines are queued by the input callbacks and written to stdout
+        # in batches by a background thread, so callbacks never block on I/O
+        self._log_q: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._log_thread: threading.Thread | None = None
+        # ``(event, callback)`` pairs added by :meth:`read_loop`, removed again
+        # in :meth:`close` so every session starts without stale callbacks
+        self._subscriptions: list[tuple[Any, Callable[..., Any]]] = []
+        # Getters for ``self.ds.state`` button fields, cached per valid name
+        self._attr_cache: dict[str, Callable[[Any], Any]] = {}
+        self._lstick = operator.attrgetter("lx", "ly")
+        self._rstick = operator.attrgetter("rx", "ry")
+        self._trigger_getters = {
+            "l2": operator.attrgetter("l2"),
+            "r2": operator.attrgetter("r2"),
+        }
 
     def open(self) -> None:
         """Open the connection to the controller over USB."""
         self.ds.init()
+        # Clear a stop request left over from a previous session
+        self._stop.clear()
+        self._log_thread = threading.Thread(
+            target=self._write_logs, name="ps5ctrl-log", daemon=True
+        )
+        self._log_thread.start()
+
+    def stop(self) -> None:
+        """Ask a running :meth:`read_loop` to return."""
+        self._stop.set()
 
     def close(self) -> None:
         """Close the connection to the controller."""
+        for event, callback in self._subscriptions:
+            event -= callback
+        self._subscriptions.clear()
+
         # Stop vibration motors
         self.ds.setRightMotor(0)
         self.ds.setLeftMotor(0)
 
         # Reset trigger forces and modes
         self.ds.triggerR.setMode(TriggerModes.Off)
-        self.ds.triggerR.forces = [0] * 7
+        self.ds.triggerR.forces[:] = _ZERO_FORCES
 
         self.ds.triggerL.setMode(TriggerModes.Off)
-        self.ds.triggerL.forces = [0] * 7
-
-        # Send reset state to controller before closing
-        self.ds.sendReport()
+        self.ds.triggerL.forces[:] = _ZERO_FORCES
 
+        # pydualsense's report thread writes the reset state in the frame it
+        # finishes before ``close`` returns
         self.ds.close()
 
+        # Flush any pending log lines and stop the writer thread
+        if self._log_thread is not None:
+            self._log_q.put(None)
+            self._log_thread.join()
+            self._log_thread = None
+
+    def _subscribe(self, event: Any, callback: Callable[..., Any]) -> None:
+        """Subscribe ``callback`` to a pydualsense event until :meth:`close`."""
+        event += callback
+        self._subscriptions.append((event, callback))
+
+    def _log(self, msg: str) -> None:
+        """Queue a line for the background log writer."""
+        self._log_q.put(msg)
+
+    def _write_logs(self) -> None:
+        """Write queued log lines to stdout until a ``None`` sentinel arrives.
+
+        Every line already waiting in the queue is written with a single
+        ``write`` and ``flush``, so bursts of events cost one I/O call.
+        """
+        while True:
+            lines = [self._log_q.get()]
+            while True:
+                try:
+                    lines.append(self._log_q.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in lines
+            if done:
+                del lines[lines.index(None):]
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            if done:
+                return
 
     def set_r2_force(self, force: int) -> None:
-        """Set R2 resistance using slot 6 and send report."""
+        """Set R2 resistance using slot 6.
+
+        pydualsense's report thread sends the new state with its next output
+        report, so changes made within one frame go out together.
+        """
         self.ds.triggerR.setMode(TriggerModes.Rigid)
         self.ds.triggerR.setForce(6, force)
-        self.ds.sendReport()
 
     def cycle_r2_force(self) -> None:
         """Cycle through R2 trigger force levels 0–6."""
-        if self._handling_r2_force:
+        state = self._r2
+        if not state.force_lock.acquire(blocking=False):
             return
-        self._handling_r2_force = True
         try:
-            self._r2_force_level = (self._r2_force_level + 1) % 7
-            self.set_r2_force(self._r2_force_level)
-            print(f"R2 force set to {self._r2_force_level}")
+            state.force_level = next(state.force_iter)
+            self.set_r2_force(state.force_level)
+            self._log(f"R2 force set to {state.force_level}")
         finally:
-            self._handling_r2_force = False
+            state.force_lock.release()
 
     def cycle_r2_mode(self) -> None:
         """Cycle through R2 trigger modes."""
-        self._r2_mode_index = (self._r2_mode_index + 1) % len(self._trigger_modes)
-        mode = self._trigger_modes[self._r2_mode_index]
-        self.ds.triggerR.setMode(mode)
-        self.ds.circle_pressed -= self._on_circle_pressed
+        state = self._r2
+        if not state.mode_lock.acquire(blocking=False):
+            return
         try:
-            self.ds.sendReport()
+            mode = next(state.mode_iter)
+            self.ds.triggerR.setMode(mode)
+            self._log(f"R2 trigger mode set to: {mode.name}")
         finally:
-            self.ds.circle_pressed += self._on_circle_pressed
-        print(f"R2 trigger mode set to: {mode.name}")
+            state.mode_lock.release()
 
     def set_l2_force(self, force: int) -> None:
-        """Set L2 resistance using slot 6 and send report."""
+        """Set L2 resistance using slot 6.
+
+        pydualsense's report thread sends the new state with its next output
+        report, so changes made within one frame go out together.
+        """
         self.ds.triggerL.setMode(TriggerModes.Rigid)
         self.ds.triggerL.setForce(6, force)
-        self.ds.sendReport()
 
     def cycle_l2_force(self) -> None:
         """Cycle through L2 trigger force levels 0–6."""
-        if self._handling_l2_force:
+        state = self._l2
+        if not state.force_lock.acquire(blocking=False):
             return
-        self._handling_l2_force = True
         try:
-            self._l2_force_level = (self._l2_force_level + 1) % 7
-            self.set_l2_force(self._l2_force_level)
-            print(f"L2 force set to {self._l2_force_level}")
+            state.force_level = next(state.force_iter)
+            self.set_l2_force(state.force_level)
+            self._log(f"L2 force set to {state.force_level}")
         finally:
-            self._handling_l2_force = False
+            state.force_lock.release()
 
     def cycle_l2_mode(self) -> None:
         """Cycle through L2 trigger modes."""
-        self._l2_mode_index = (self._l2_mode_index + 1) % len(self._trigger_modes)
-        mode = self._trigger_modes[self._l2_mode_index]
-        self.ds.triggerL.setMode(mode)
-        self.ds.square_pressed -= self._on_square_pressed
+        state = self._l2
+        if not state.mode_lock.acquire(blocking=False):
+            return
         try:
-            self.ds.sendReport()
+            mode = next(state.mode_iter)
+            self.ds.triggerL.setMode(mode)
+            self._log(f"L2 trigger mode set to: {mode.name}")
         finally:
-            self.ds.square_pressed += self._on_square_pressed
-        print(f"L2 trigger mode set to: {mode.name}")
+            state.mode_lock.release()
 
     def _on_cross_pressed(self, val: bool) -> None:
         """Handle cross button presses to cycle R2 force."""
@@ -143,32 +303,48 @@ class DualSenseController:
     # State query helpers
     def is_button_pressed(self, button: str) -> bool:
         """Return ``True`` if the given button is pressed."""
+        getter = self._attr_cache.get(button)
+        if getter is not None:
+            return bool(getter(self.ds.state))
+        # ``attrgetter`` follows dotted paths; only plain field names are
+        # buttons, and a getter is cached only once the field is known to exist
+        if "." in button:
+            raise ValueError(f"Unknown button: {button}")
+        getter = operator.attrgetter(button)
         try:
-            return bool(getattr(self.ds.state, button))
+            pressed = bool(getter(self.ds.state))
         except AttributeError:
             raise ValueError(f"Unknown button: {button}")
+        self._attr_cache[button] = getter
+        return pressed
 
     def get_trigger_value(self, trigger: str) -> int:
         """Return the value of a trigger (e.g. ``'l2'`` or ``'r2'``)."""
+        getter = self._trigger_getters.get(trigger)
+        if getter is None:
+            getter = self._trigger_getters.get(trigger.lower())
+            if getter is None:
+                raise ValueError(f"Unknown trigger: {trigger}")
         try:
-            return int(getattr(self.ds.state, trigger))
+            return getter(self.ds.state)
         except AttributeError:
             raise ValueError(f"Unknown trigger: {trigger}")
 
     def get_joystick_state(self, stick: str) -> tuple[int, int]:
         """Return the ``(x, y)`` position for the given joystick."""
-        stick = stick.lower()
-        if stick not in {"left", "right"}:
-            raise ValueError("stick must be 'left' or 'right'")
-        prefix = "l" if stick == "left" else "r"
-        x_attr = f"{prefix}x"
-        y_attr = f"{prefix}y"
+        if stick == "left":
+            getter = self._lstick
+        elif stick == "right":
+            getter = self._rstick
+        else:
+            stick = stick.lower()
+            if stick not in {"left", "right"}:
+                raise ValueError("stick must be 'left' or 'right'")
+            getter = self._lstick if stick == "left" else self._rstick
         try:
-            x = getattr(self.ds.state, x_attr)
-            y = getattr(self.ds.state, y_attr)
+            return getter(self.ds.state)
         except AttributeError as exc:
             raise ValueError("Joystick state attributes missing") from exc
-        return int(x), int(y)
 
     def list_trigger_modes(self) -> None:
         "Print out the available trigger modes"
@@ -176,40 +352,68 @@ class DualSenseController:
         for mode in self._trigger_modes:
             print(f"- {mode.name}")
 
-    def read_loop(self) -> None:
-        """Listen for controller events using pydualsense event handlers."""
+    def read_loop(
+        self,
+        *,
+        log_buttons: bool = True,
+        log_triggers: bool = True,
+        log_dpad: bool = True,
+        log_sticks: bool = True,
+    ) -> None:
+        """Listen for controller events using pydualsense event handlers.
+
+        Input is logged to stdout by the background writer; status messages
+        go to stderr so they never contend with it. The ``log_*`` flags
+        choose which inputs are printed. Groups that are disabled are not
+        subscribed at all, so their events cost nothing.
+        """
 
-        print("Listening for controller input. Press CTRL+C to stop.")
+        sys.stderr.write("Listening for controller input. Press CTRL+C to stop.\n")
 
         # Register event callbacks
-        self.ds.l1_changed += lambda val: print(f"L1: {val}")
-        self.ds.r1_changed += lambda val: print(f"R1: {val}")
-        # self.ds.l2_value_changed += lambda val: print(f"L2: {val}")
-        # self.ds.r2_value_changed += lambda val: print(f"R2: {val}")
-        # self.ds.r2_value_changed += lambda val: self.ds.setRightMotor(255 - val)
-        # self.ds.l2_value_changed += lambda val: self.ds.setLeftMotor(255 - val)
-        self.ds.l2_value_changed += lambda val: print(f"L2 value: {val}")
-        self.ds.r2_value_changed += lambda val: print(f"R2 value: {val}")
-
-        self.ds.l3_changed += lambda val: print(f"L3: {val}")
-        self.ds.r3_changed += lambda val: print(f"R3: {val}")
-        self.ds.dpad_up += lambda _: print("D-Pad: Up")
-        self.ds.dpad_down += lambda _: print("D-Pad: Down")
-        self.ds.dpad_left += lambda _: print("D-Pad: Left")
-        self.ds.dpad_right += lambda _: print("D-Pad: Right")
-        self.ds.left_joystick_changed += lambda x, y: print(f"Left Stick: x={x}, y={y}")
-        self.ds.right_joystick_changed += lambda x, y: print(f"Right Stick: x={x}, y={y}")
-
-        self.ds.cross_pressed += self._on_cross_pressed
-        self.ds.circle_pressed += self._on_circle_pressed
-        self.ds.square_pressed += self._on_square_pressed
-        self.ds.triangle_pressed += self._on_triangle_pressed
+        # Templates and the queue are bound as defaults so each event does
+        # no attribute lookups on ``self``
+        q = self._log_q
+        ds = self.ds
+        subscribe = self._subscribe
+        if log_buttons:
+            subscribe(ds.l1_changed, lambda val, _f=self._FMT_L1, _q=q: _q.put(_f % val))
+            subscribe(ds.r1_changed, lambda val, _f=self._FMT_R1, _q=q: _q.put(_f % val))
+            subscribe(ds.l3_changed, lambda val, _f=self._FMT_L3, _q=q: _q.put(_f % val))
+            subscribe(ds.r3_changed, lambda val, _f=self._FMT_R3, _q=q: _q.put(_f % val))
+        if log_triggers:
+            # subscribe(ds.r2_value_changed, lambda val: ds.setRightMotor(255 - val))
+            # subscribe(ds.l2_value_changed, lambda val: ds.setLeftMotor(255 - val))
+            subscribe(ds.l2_value_changed, lambda val, _f=self._FMT_L2, _q=q: _q.put(_f % val))
+            subscribe(ds.r2_value_changed, lambda val, _f=self._FMT_R2, _q=q: _q.put(_f % val))
+        if log_dpad:
+            for direction in ("up", "down", "left", "right"):
+                subscribe(
+                    getattr(ds, f"dpad_{direction}"),
+                    lambda _, _m=f"D-Pad: {direction.capitalize()}", _q=q: _q.put(_m),
+                )
+        if log_sticks:
+            subscribe(
+                ds.left_joystick_changed,
+                lambda x, y, _f=self._FMT_LS, _q=q: _q.put(_f % (x, y)),
+            )
+            subscribe(
+                ds.right_joystick_changed,
+                lambda x, y, _f=self._FMT_RS, _q=q: _q.put(_f % (x, y)),
+            )
 
+        subscribe(ds.cross_pressed, _weak_press_callback(self._on_cross_pressed))
+        subscribe(ds.circle_pressed, _weak_press_callback(self._on_circle_pressed))
+        subscribe(ds.square_pressed, _weak_press_callback(self._on_square_pressed))
+        subscribe(ds.triangle_pressed, _weak_press_callback(self._on_triangle_pressed))
 
+        # Block until stopped instead of waking up periodically; CTRL+C
+        # raises KeyboardInterrupt, which interrupts the wait immediately
         try:
-            while True:
-                time.sleep(0.1)
+            while not self._stop.wait(self._poll_interval):
+                pass
         except KeyboardInterrupt:
-            print("Stopping controller listener...")
+            self._stop.set()
         finally:
+            sys.stderr.write("Stopping controller listener...\n")
             self.close()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Make the in-tree package importable once per session
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -1,53 +1,187 @@
+import gc
 import os
+import signal
 import sys
+import threading
+import time
+import weakref
 from enum import Enum
+from types import SimpleNamespace
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import pytest
 
 import ps5ctrl.controller as controller
 
 
 class DummyEvent:
+    __slots__ = ("_callbacks", "_snapshot", "_single", "_frozen")
+
     def __init__(self):
-        self._callbacks = []
+        # Insertion-ordered dict used as a set for O(1) add/remove
+        self._callbacks = {}
+        # Copy-on-write snapshot iterated by __call__, rebuilt on mutation;
+        # a lone subscriber is also kept in _single for a loop-free dispatch
+        self._snapshot = ()
+        self._single = None
+        self._frozen = False
+
+    def _rebuild(self):
+        self._snapshot = tuple(self._callbacks)
+        self._single = self._snapshot[0] if len(self._snapshot) == 1 else None
+
+    def add(self, cb):
+        assert not self._frozen, "subscribers changed after freeze()"
+        self._callbacks[cb] = None
+        self._rebuild()
+        return self
 
-    def __iadd__(self, cb):
-        self._callbacks.append(cb)
+    def extend(self, cbs):
+        """Add several callbacks, rebuilding the snapshot only once."""
+        assert not self._frozen, "subscribers changed after freeze()"
+        self._callbacks.update(dict.fromkeys(cbs))
+        self._rebuild()
         return self
 
-    def __isub__(self, cb):
-        self._callbacks.remove(cb)
+    def remove(self, cb):
+        assert not self._frozen, "subscribers changed after freeze()"
+        self._callbacks.pop(cb, None)
+        self._rebuild()
         return self
 
+    # pydualsense-style ``event += cb`` / ``event -= cb``, used by controller.py
+    __iadd__ = add
+    __isub__ = remove
+
     def __call__(self, *args, **kwargs):
-        for cb in list(self._callbacks):
+        if not self._snapshot:
+            return
+        single = self._single
+        if single is not None:
+            single(*args, **kwargs)
+            return
+        for cb in self._snapshot:
             cb(*args, **kwargs)
 
+    def fire_n(self, n, *args, **kwargs):
+        """Fire the event ``n`` times with the same arguments."""
+        for _ in range(n):
+            self(*args, **kwargs)
+
+    def freeze(self):
+        """Fix the subscriber snapshot; later add/remove calls fail."""
+        self._frozen = True
+        return self
+
+    def clear(self):
+        self._callbacks.clear()
+        self._rebuild()
+        self._frozen = False
+
 
 class DummyTrigger:
-    def setMode(self, mode):
-        pass
+    __slots__ = ()
+
+    # Shared static no-op: no bound method is created per call
+    _NOOP = staticmethod(lambda *args, **kwargs: None)
+    setMode = _NOOP
+    setForce = _NOOP
+    # Only ever reset in place by DualSenseController.close()
+    forces = [0] * 7
 
-    def setForce(self, slot, force):
-        pass
+
+# DummyTrigger is stateless, so one instance serves every DummyDS
+_TRIGGER = DummyTrigger()
+
+
+# Every pydualsense event DualSenseController subscribes to
+EVENT_NAMES = (
+    "l1_changed",
+    "r1_changed",
+    "l3_changed",
+    "r3_changed",
+    "l2_value_changed",
+    "r2_value_changed",
+    "dpad_up",
+    "dpad_down",
+    "dpad_left",
+    "dpad_right",
+    "left_joystick_changed",
+    "right_joystick_changed",
+    "cross_pressed",
+    "circle_pressed",
+    "square_pressed",
+    "triangle_pressed",
+)
 
 
 class DummyDS:
+    """Stand-in for pydualsense's device object.
+
+    As in pydualsense, ``init()`` starts a report thread running
+    ``sendReport()``, which loops reading input and writing output reports
+    until ``close()``. Nothing else may call ``sendReport()``.
+    """
+
+    __slots__ = (
+        "triggerR",
+        "triggerL",
+        "state",
+        "reports_sent",
+        "_running",
+        "_report_thread",
+    ) + EVENT_NAMES
+
     def __init__(self):
-        self.triggerR = DummyTrigger()
-        self.triggerL = DummyTrigger()
-        self.circle_pressed = DummyEvent()
-        self.square_pressed = DummyEvent()
+        self.triggerR = _TRIGGER
+        self.triggerL = _TRIGGER
+        for name in EVENT_NAMES:
+            setattr(self, name, DummyEvent())
+        self.state = SimpleNamespace()
+        self.reports_sent = 0
+        self._running = False
+        self._report_thread = None
+
+    def reset(self):
+        """Return to the freshly constructed state for reuse."""
+        for name in EVENT_NAMES:
+            getattr(self, name).clear()
+        self.state = SimpleNamespace()
+        self.reports_sent = 0
+
+    def init(self):
+        self._running = True
+        self._report_thread = threading.Thread(target=self.sendReport, daemon=True)
+        self._report_thread.start()
+
+    def close(self):
+        self._running = False
+        self._report_thread.join()
+        self._report_thread = None
+
+    def setRightMotor(self, value):
+        pass
+
+    def setLeftMotor(self, value):
+        pass
 
     def sendReport(self):
-        # Simulate hardware re-emitting pressed events on report
-        self.circle_pressed(True)
-        self.square_pressed(True)
+        # pydualsense's report loop, not a one-shot send; a second caller
+        # would read the device concurrently or block until close()
+        assert threading.current_thread() is self._report_thread, (
+            "sendReport is pydualsense's own report loop"
+        )
+        while self._running:
+            self.reports_sent += 1
+            time.sleep(0.001)
+
+
+# Released DummyDS instances, reused by later tests instead of reallocated
+_DS_POOL = []
 
 
 class DummyPyDualSense:
     def __call__(self):
-        return DummyDS()
+        return _DS_POOL.pop() if _DS_POOL else DummyDS()
 
 
 class DummyTriggerModes(Enum):
@@ -56,17 +190,241 @@ class DummyTriggerModes(Enum):
     Mode2 = 2
 
 
+_DUMMY_PYDS = DummyPyDualSense()
+
+
 def create_controller():
-    controller.pydualsense = DummyPyDualSense()
-    controller.TriggerModes = DummyTriggerModes
+    # Patch the module globals once rather than on every call
+    if controller.pydualsense is not _DUMMY_PYDS:
+        controller.pydualsense = _DUMMY_PYDS
+        controller.TriggerModes = DummyTriggerModes
     return controller.DualSenseController()
 
 
-def test_cycle_modes_no_recursion():
+@pytest.fixture
+def ctrl():
+    ctrl = create_controller()
+    yield ctrl
+    ctrl.ds.reset()
+    _DS_POOL.append(ctrl.ds)
+
+
+def test_cycle_modes_no_recursion(ctrl):
+    circle_evt = ctrl.ds.circle_pressed
+    square_evt = ctrl.ds.square_pressed
+    presses = []
+    # Circle has several subscribers, square a single one, so both dispatch
+    # paths of DummyEvent are exercised
+    circle_evt.extend([ctrl._on_circle_pressed, presses.append])
+    square_evt.add(ctrl._on_square_pressed)
+    circle_evt.freeze()
+    square_evt.freeze()
+
+    # Cycling only changes trigger state; DummyDS fails if the controller
+    # calls sendReport() itself instead of leaving it to the report loop
+    ctrl.open()
+    circle_evt.fire_n(10, True)
+    square_evt.fire_n(10, True)
+    ctrl.close()
+
+    assert len(presses) == 10
+
+
+def wait_for_reports(ds, count, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while ds.reports_sent < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return ds.reports_sent >= count
+
+
+def test_controller_can_be_reopened_after_close(ctrl):
+    for session in range(1, 3):
+        ctrl.open()
+        ctrl.cycle_r2_force()
+        assert ctrl._r2.force_level == session
+        sent = ctrl.ds.reports_sent
+        assert wait_for_reports(ctrl.ds, sent + 1)
+        ctrl.stop()
+        ctrl.close()
+        assert ctrl.ds._report_thread is None
+
+
+def test_press_callback_ignores_releases(ctrl):
+    ctrl.ds.cross_pressed.add(controller._weak_press_callback(ctrl._on_cross_pressed))
+
+    ctrl.ds.cross_pressed.fire_n(3, False)
+
+    assert ctrl._r2.force_level == 0
+
+
+def test_press_callback_cycles_on_press(ctrl):
+    ctrl.ds.cross_pressed.add(controller._weak_press_callback(ctrl._on_cross_pressed))
+
+    ctrl.ds.cross_pressed.fire_n(3, True)
+
+    assert ctrl._r2.force_level == 3
+
+
+def test_press_callback_is_noop_for_dead_controller():
     ctrl = create_controller()
-    ctrl.ds.circle_pressed += ctrl._on_circle_pressed
-    ctrl.ds.square_pressed += ctrl._on_square_pressed
+    ds = ctrl.ds
+    ds.circle_pressed.add(controller._weak_press_callback(ctrl._on_circle_pressed))
+    ref = weakref.ref(ctrl)
+
+    del ctrl
+    gc.collect()
+
+    assert ref() is None
+    ds.circle_pressed(True)
+    ds.reset()
+    _DS_POOL.append(ds)
+
+
+def test_is_button_pressed_rejects_unknown_and_dotted_names(ctrl):
+    ctrl.ds.state = SimpleNamespace(cross=True, sub=SimpleNamespace(x=1))
+
+    assert ctrl.is_button_pressed("cross")
+    for name in ("bogus", "sub.x"):
+        with pytest.raises(ValueError):
+            ctrl.is_button_pressed(name)
+
+    assert list(ctrl._attr_cache) == ["cross"]
+
+
+def start_read_loop(ctrl, **flags):
+    """Open ``ctrl`` and run its read_loop in a thread until subscribed."""
+    ctrl.open()
+    thread = threading.Thread(target=ctrl.read_loop, kwargs=flags, daemon=True)
+    thread.start()
+    # The press callbacks are subscribed last
+    deadline = time.monotonic() + 1.0
+    while not ctrl.ds.triangle_pressed._snapshot:
+        assert time.monotonic() < deadline, "read_loop did not subscribe"
+        time.sleep(0.001)
+    return thread
+
+
+def subscriber_counts(ds):
+    return {name: len(getattr(ds, name)._snapshot) for name in EVENT_NAMES}
+
+
+def test_read_loop_sessions_do_not_stack_subscriptions(ctrl):
+    for session in range(1, 3):
+        thread = start_read_loop(ctrl)
+        assert set(subscriber_counts(ctrl.ds).values()) == {1}
+
+        ctrl.ds.cross_pressed(True)
+        assert ctrl._r2.force_level == session
+
+        ctrl.stop()
+        thread.join(timeout=1.0)
+        assert not thread.is_alive()
+        assert set(subscriber_counts(ctrl.ds).values()) == {0}
+
+
+def test_read_loop_logs_events_to_stdout(ctrl, capsys):
+    thread = start_read_loop(ctrl)
+
+    ctrl.ds.l1_changed(True)
+    ctrl.ds.l2_value_changed(128)
+    ctrl.ds.dpad_left(True)
+    ctrl.ds.left_joystick_changed(3, -4)
+    ctrl.stop()
+    thread.join(timeout=1.0)
+
+    assert capsys.readouterr().out.splitlines() == [
+        "L1: True",
+        "L2 value: 128",
+        "D-Pad: Left",
+        "Left Stick: x=3, y=-4",
+    ]
+
+
+class RecordingStream:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        pass
+
+
+def test_write_logs_batches_queued_lines_until_sentinel(ctrl, monkeypatch):
+    stream = RecordingStream()
+    monkeypatch.setattr(sys, "stdout", stream)
+    for line in ("a", "b", "c"):
+        ctrl._log(line)
+    ctrl._log_q.put(None)
+
+    ctrl._write_logs()
+
+    assert stream.writes == ["a\nb\nc\n"]
+
+
+def test_close_flushes_queued_lines(ctrl, capsys):
+    ctrl.open()
+    lines = [f"line {i}" for i in range(100)]
+    for line in lines:
+        ctrl._log(line)
+
+    ctrl.close()
+
+    assert capsys.readouterr().out.splitlines() == lines
+
+
+def test_read_loop_skips_disabled_log_groups(ctrl):
+    thread = start_read_loop(ctrl, log_dpad=False, log_sticks=False)
+    counts = subscriber_counts(ctrl.ds)
+    ctrl.stop()
+    thread.join(timeout=1.0)
+
+    disabled = {
+        "dpad_up",
+        "dpad_down",
+        "dpad_left",
+        "dpad_right",
+        "left_joystick_changed",
+        "right_joystick_changed",
+    }
+    assert {name for name, n in counts.items() if n == 0} == disabled
+    assert all(counts[name] == 1 for name in EVENT_NAMES if name not in disabled)
+
+
+def run_read_loop_then(ctrl, action):
+    """Run read_loop on this thread; call ``action`` once it is waiting."""
+
+    def trigger():
+        while not ctrl.ds.triangle_pressed._snapshot:
+            time.sleep(0.001)
+        # Let read_loop move from subscribing into its wait
+        time.sleep(0.05)
+        action()
+
+    ctrl.open()
+    helper = threading.Thread(target=trigger, daemon=True)
+    helper.start()
+    started = time.monotonic()
+    ctrl.read_loop()
+    helper.join(timeout=1.0)
+    return time.monotonic() - started
+
+
+def test_stop_ends_blocking_read_loop(ctrl, capsys):
+    elapsed = run_read_loop_then(ctrl, ctrl.stop)
+
+    assert elapsed < 1.0
+    assert ctrl.ds._report_thread is None
+    assert capsys.readouterr().err.splitlines() == [
+        "Listening for controller input. Press CTRL+C to stop.",
+        "Stopping controller listener...",
+    ]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signal delivery")
+def test_sigint_ends_blocking_read_loop(ctrl):
+    elapsed = run_read_loop_then(ctrl, lambda: os.kill(os.getpid(), signal.SIGINT))
 
-    for _ in range(10):
-        ctrl._on_circle_pressed(True)
-        ctrl._on_square_pressed(True)
+    assert elapsed < 1.0
+    assert ctrl.ds._report_thread is None